@@ -9,11 +9,11 @@ from pathlib import Path
 # if run outside the environment. But typically run with 'uv run'.
 
 FILES = {
-    "config.yaml": r'(^version:\s*)"?([\d\.]+)"?',
-    "pyproject.toml": r'(^version\s*=\s*)"([\d\.]+)"'
+    "config.yaml": re.compile(r'(^version:\s*)"?([\d\.]+)"?', re.MULTILINE),
+    "pyproject.toml": re.compile(r'(^version\s*=\s*)"([\d\.]+)"', re.MULTILINE),
 }
 
-def bump_file(path: Path, new_version: str, pattern: str):
+def bump_file(path: Path, new_version: str, pattern: re.Pattern[str]):
     if not path.exists():
         print(f"Error: {path} not found.")
         sys.exit(1)
@@ -21,7 +21,7 @@ def bump_file(path: Path, new_version: str, pattern: str):
     content = path.read_text(encoding="utf-8")
     
     # Check if version matches
-    match = re.search(pattern, content, re.MULTILINE)
+    match = pattern.search(content)
     if not match:
         print(f"Error: Could not find version pattern in {path}")
         sys.exit(1)
@@ -30,30 +30,37 @@ def bump_file(path: Path, new_version: str, pattern: str):
     print(f"{path}: {current_version} -> {new_version}")
     
     # Replace
-    # We reconstruct the line using group 1 (prefix) and new version
-    new_content = re.sub(pattern, f'\\g<1>"{new_version}"', content, count=1, flags=re.MULTILINE)
+    # We reconstruct the line using group 1 (prefix) and new version,
+    # splicing at the match we already have instead of re-running the regex.
+    new_content = content[:match.start()] + f'{match.group(1)}"{new_version}"' + content[match.end():]
     
     path.write_text(new_content, encoding="utf-8")
 
+def _git(*args: str):
+    # Capture output so the child doesn't inherit our console handles
+    # (noticeably faster to spawn on Windows); surface it on failure.
+    subprocess.run(["git", *args], check=True, capture_output=True, text=True)
+
 def git_commit_tag_push(version: str):
     try:
         # Add files
-        subprocess.check_call(["git", "add", "config.yaml", "pyproject.toml"])
+        _git("add", "config.yaml", "pyproject.toml")
         
         # Commit
         msg = f"Bump version to {version}"
-        subprocess.check_call(["git", "commit", "-m", msg])
+        _git("commit", "-m", msg)
         
-        # Tag
-        subprocess.check_call(["git", "tag", f"v{version}"])
+        # Tag (annotated, so --follow-tags picks it up)
+        _git("tag", "-a", f"v{version}", "-m", msg)
         
-        # Push (triggers the parent-sync workflow)
+        # Push commit and tag in one go (triggers the parent-sync workflow)
         print("Pushing to GitHub (this will trigger parent repo update)...")
-        subprocess.check_call(["git", "push"])
-        subprocess.check_call(["git", "push", "--tags"])
+        _git("push", "--follow-tags")
         
     except subprocess.CalledProcessError as e:
         print(f"Git operation failed: {e}")
+        if e.stderr:
+            print(e.stderr.strip())
         sys.exit(1)
 
 def main():
@@ -0,0 +1,16 @@
+"""Helpers shared by the local test clients in this directory."""
+import socket
+
+from wyoming.client import AsyncTcpClient
+
+
+def set_tcp_nodelay(client: AsyncTcpClient) -> None:
+    """Disable Nagle so small audio frames are sent immediately.
+
+    Relies on the client's private stream writer; if a wyoming release
+    renames it, this becomes a no-op instead of failing.
+    """
+    writer = getattr(client, "_writer", None)
+    sock = writer.get_extra_info("socket") if writer is not None else None
+    if sock is not None:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
@@ -10,14 +10,15 @@ import logging
 from wyoming.audio import AudioChunk, AudioStart, AudioStop
 from wyoming.client import AsyncTcpClient
 
+from client_utils import set_tcp_nodelay
+
 logging.basicConfig(level=logging.DEBUG)
 _LOGGER = logging.getLogger("diag")
 
 try:
     import sounddevice as sd
-    import numpy as np
 except ImportError:
-    print("pip install sounddevice numpy")
+    print("pip install sounddevice")
     exit(1)
 
 
@@ -29,51 +30,72 @@ async def main():
 
     RATE = 16000
     CHUNK = 1024
+    SEND_BYTES = 4 * CHUNK * 2  # coalesce 4 mic blocks per AudioChunk
 
     _LOGGER.info("Connecting to %s:%s...", args.host, args.port)
     client = AsyncTcpClient(args.host, args.port)
     await client.connect()
+    set_tcp_nodelay(client)
     _LOGGER.info("Connected!")
 
     # Output stream for playing received audio
-    output_stream = sd.OutputStream(samplerate=RATE, channels=1, dtype='int16', latency='low')
+    output_stream = sd.RawOutputStream(samplerate=RATE, channels=1, dtype='int16', latency='low')
     output_stream.start()
 
-    # Input stream for mic
-    input_stream = sd.InputStream(samplerate=RATE, channels=1, dtype='int16', blocksize=CHUNK)
-    input_stream.start()
-
     loop = asyncio.get_running_loop()
     stop = asyncio.Event()
     recording = True
 
+    # Input stream for mic: PortAudio pushes blocks straight onto the loop.
+    mic_queue: asyncio.Queue[bytes] = asyncio.Queue()
+
+    def mic_callback(indata, frames, time_info, status):
+        loop.call_soon_threadsafe(mic_queue.put_nowait, bytes(indata))
+
+    input_stream = sd.RawInputStream(
+        samplerate=RATE, channels=1, dtype='int16', blocksize=CHUNK, callback=mic_callback
+    )
+    input_stream.start()
+
     async def receive_loop():
         """Just read events from server and print/play them."""
         _LOGGER.info("Starting receive loop...")
-        while not stop.is_set():
-            try:
-                event = await asyncio.wait_for(client.read_event(), timeout=0.5)
-            except asyncio.TimeoutError:
-                continue
-            except Exception as e:
-                _LOGGER.error("Read error: %s", e)
-                break
-
-            if event is None:
-                _LOGGER.warning("Server closed connection")
-                stop.set()
-                break
-
-            _LOGGER.info("EVENT: type=%s", event.type)
-
-            if AudioChunk.is_type(event.type):
-                chunk = AudioChunk.from_event(event)
-                _LOGGER.info("  -> AudioChunk: %d bytes", len(chunk.audio))
-                output_stream.write(np.frombuffer(chunk.audio, dtype=np.int16))
-            elif AudioStart.is_type(event.type):
-                _LOGGER.info("  -> AudioStart")
-            elif AudioStop.is_type(event.type):
-                _LOGGER.info("  -> AudioStop")
+        stop_task = asyncio.create_task(stop.wait())
+        try:
+            while True:
+                # Race the read against stop instead of polling with a timeout.
+                read_task = asyncio.create_task(client.read_event())
+                done, _ = await asyncio.wait(
+                    {read_task, stop_task}, return_when=asyncio.FIRST_COMPLETED
+                )
+                if read_task not in done:
+                    read_task.cancel()
+                    break
+                try:
+                    event = read_task.result()
+                except Exception as e:
+                    _LOGGER.error("Read error: %s", e)
+                    break
+
+                if event is None:
+                    _LOGGER.warning("Server closed connection")
+                    stop.set()
+                    break
+
+                _LOGGER.info("EVENT: type=%s", event.type)
+
+                if AudioChunk.is_type(event.type):
+                    # Use the raw payload; no need to build an AudioChunk dataclass.
+                    audio = event.payload or b""
+                    _LOGGER.info("  -> AudioChunk: %d bytes", len(audio))
+                    # Payload is already int16 PCM; hand the bytes straight to PortAudio.
+                    output_stream.write(audio)
+                elif AudioStart.is_type(event.type):
+                    _LOGGER.info("  -> AudioStart")
+                elif AudioStop.is_type(event.type):
+                    _LOGGER.info("  -> AudioStop")
+        finally:
+            stop_task.cancel()
 
     async def send_loop():
         """Record 3 seconds of mic audio, send it, then wait for response."""
@@ -83,12 +105,18 @@ async def main():
         await client.write_event(AudioStart(rate=RATE, width=2, channels=1).event())
 
         _LOGGER.info("Recording 3 seconds of audio... SPEAK NOW!")
+        accum = bytearray()
         for i in range(int(3 * RATE / CHUNK)):
-            data, _ = await loop.run_in_executor(None, input_stream.read, CHUNK)
-            chunk = AudioChunk(rate=RATE, width=2, channels=1, audio=bytes(data), timestamp=0)
-            await client.write_event(chunk.event())
+            accum.extend(await mic_queue.get())
+            if len(accum) >= SEND_BYTES:
+                chunk = AudioChunk(rate=RATE, width=2, channels=1, audio=bytes(accum), timestamp=0)
+                await client.write_event(chunk.event())
+                accum.clear()
             if i % 15 == 0:
-                _LOGGER.debug("Sent chunk %d", i)
+                _LOGGER.debug("Captured block %d", i)
+        if accum:
+            chunk = AudioChunk(rate=RATE, width=2, channels=1, audio=bytes(accum), timestamp=0)
+            await client.write_event(chunk.event())
 
         _LOGGER.info("Sending AudioStop...")
         await client.write_event(AudioStop().event())
@@ -1,39 +1,49 @@
 
 import asyncio
 import logging
+import socket
 import time
 
 logging.basicConfig(level=logging.DEBUG)
 _LOGGER = logging.getLogger("diagnostic")
 
+# Wyoming event format: {json_length}\n{json_content}
+# The headers never change, so encode them once up front.
+START = b'{"type": "audio-start", "data": {"rate": 16000, "width": 2, "channels": 1}}'
+CHUNK_HEADER = b'{"type": "audio-chunk", "data": {"rate": 16000, "width": 2, "channels": 1}}'
+STOP = b'{"type": "audio-stop", "data": {}}'
+
+START_FRAME = f"{len(START)}\n".encode() + START
+CHUNK_HEADER_FRAME = f"{len(CHUNK_HEADER)}\n".encode() + CHUNK_HEADER
+STOP_FRAME = f"{len(STOP)}\n".encode() + STOP
+
+SILENCE = bytes(32000)  # 1 second at 16 kHz PCM16
+
 async def main():
     host = "192.168.1.225"
     port = 10700
     
     _LOGGER.info(f"Connecting to {host}:{port}...")
-    reader, writer = await asyncio.open_connection(host, port)
+    reader, writer = await asyncio.open_connection(host, port, limit=1 << 20)
+    sock = writer.get_extra_info("socket")
+    if sock is not None:
+        # Small control frames should go out immediately, not wait on Nagle.
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
     _LOGGER.info("Connected!")
 
     # 1. Send AudioStart
-    # Wyoming event format: {json_length}\n{json_content}
-    content = '{"type": "audio-start", "data": {"rate": 16000, "width": 2, "channels": 1}}'
-    writer.write(f"{len(content)}\n{content}".encode())
+    writer.write(START_FRAME)
     await writer.drain()
     _LOGGER.info("Sent AudioStart")
 
     # 2. Send 1 second of silence
     # AudioChunk format: {header_len}\n{header_json}{payload_len}\n{payload_bytes}
-    header = '{"type": "audio-chunk", "data": {"rate": 16000, "width": 2, "channels": 1}}'
-    audio = b"\x00" * 32000 # 1 second
-    writer.write(f"{len(header)}\n{header}".encode())
-    writer.write(f"{len(audio)}\n".encode())
-    writer.write(audio)
+    writer.writelines([CHUNK_HEADER_FRAME, f"{len(SILENCE)}\n".encode(), SILENCE])
     await writer.drain()
     _LOGGER.info("Sent 1s of silence")
 
     # 3. Send AudioStop
-    content = '{"type": "audio-stop", "data": {}}'
-    writer.write(f"{len(content)}\n{content}".encode())
+    writer.write(STOP_FRAME)
     await writer.drain()
     _LOGGER.info("Sent AudioStop")
 
@@ -41,7 +51,7 @@ async def main():
     _LOGGER.info("Listening for raw bytes for 10 seconds...")
     try:
         while True:
-            data = await asyncio.wait_for(reader.read(4096), timeout=10)
+            data = await asyncio.wait_for(reader.read(65536), timeout=10)
             if not data:
                 _LOGGER.info("Connection closed by server")
                 break
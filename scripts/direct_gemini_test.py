@@ -13,6 +13,7 @@ from google.genai import types
 SEND_SAMPLE_RATE = 16000
 RECEIVE_SAMPLE_RATE = 24000
 CHUNK_SIZE = 1024
+SEND_BYTES = 4 * CHUNK_SIZE * 2  # coalesce 4 mic blocks per send
 RECORD_SECONDS = 5
 
 MODEL = "models/gemini-2.5-flash-native-audio-preview-12-2025"
@@ -39,44 +40,55 @@ CONFIG = types.LiveConnectConfig(
 class GeminiTest:
     def __init__(self):
         self.out_queue = asyncio.Queue(maxsize=5)
-        self.audio_in_queue = asyncio.Queue()
+        self.audio_buf = bytearray()
         self.session = None
         self.done_recording = False
-        self.done_receiving = False
+        self.done_receiving = asyncio.Event()
 
     async def listen_mic(self):
         """Capture mic and queue for sending."""
         loop = asyncio.get_running_loop()
-        stream = sd.InputStream(
+        mic_queue: asyncio.Queue[bytes] = asyncio.Queue()
+
+        def callback(indata, frames, time_info, status):
+            loop.call_soon_threadsafe(mic_queue.put_nowait, bytes(indata))
+
+        stream = sd.RawInputStream(
             samplerate=SEND_SAMPLE_RATE,
             channels=1,
             dtype='int16',
             blocksize=CHUNK_SIZE,
+            callback=callback,
         )
         stream.start()
         print(f"🎤 Recording for {RECORD_SECONDS} seconds... SPEAK NOW!")
         
         count = 0
         target = int(RECORD_SECONDS * SEND_SAMPLE_RATE / CHUNK_SIZE)
+        accum = bytearray()
         while count < target:
-            data, _ = await loop.run_in_executor(None, stream.read, CHUNK_SIZE)
-            await self.out_queue.put({"data": bytes(data), "mime_type": "audio/pcm"})
+            accum.extend(await mic_queue.get())
+            if len(accum) >= SEND_BYTES:
+                await self.out_queue.put({"data": bytes(accum), "mime_type": "audio/pcm"})
+                accum.clear()
             count += 1
             if count % 20 == 0:
                 print(f"  📤 {count * CHUNK_SIZE / SEND_SAMPLE_RATE:.1f}s...")
         
+        if accum:
+            await self.out_queue.put({"data": bytes(accum), "mime_type": "audio/pcm"})
         stream.stop()
         print("✅ Done recording")
         self.done_recording = True
+        await self.out_queue.put(None)  # sentinel: no more audio
 
     async def send_audio(self):
         """Send queued audio to Gemini."""
-        while not (self.done_recording and self.out_queue.empty()):
-            try:
-                msg = await asyncio.wait_for(self.out_queue.get(), timeout=0.1)
-                await self.session.send(input=msg)
-            except asyncio.TimeoutError:
-                continue
+        while True:
+            msg = await self.out_queue.get()
+            if msg is None:
+                break
+            await self.session.send(input=msg)
         print("✅ All audio sent to Gemini")
 
     async def receive_audio(self):
@@ -84,12 +96,12 @@ class GeminiTest:
         print("👂 Listening for Gemini...")
         response_count = 0
         
-        while not self.done_receiving:
+        while not self.done_receiving.is_set():
             try:
                 turn = self.session.receive()
                 async for response in turn:
                     if data := response.data:
-                        self.audio_in_queue.put_nowait(data)
+                        self.audio_buf.extend(data)
                         response_count += 1
                         if response_count % 20 == 0:
                             print(f"  📥 Received {response_count} chunks...")
@@ -98,7 +110,7 @@ class GeminiTest:
                 
                 print(f"🔄 Turn complete ({response_count} chunks)")
                 if response_count > 0:
-                    self.done_receiving = True
+                    self.done_receiving.set()
             except asyncio.CancelledError:
                 break
             except Exception as e:
@@ -106,25 +118,21 @@ class GeminiTest:
                     break
                 print(f"  Error: {e}")
                 break
+        # Wake the player even if the session ended early.
+        self.done_receiving.set()
 
     async def play_buffered_audio(self):
         """Play all buffered audio after receiving is done."""
         # Wait for responses to come in
-        await asyncio.sleep(1)
-        while not self.done_receiving:
-            await asyncio.sleep(0.5)
+        await self.done_receiving.wait()
         
-        if self.audio_in_queue.empty():
+        if not self.audio_buf:
             print("❌ No audio received from Gemini")
             return
         
         print("🔊 Playing response...")
-        chunks = []
-        while not self.audio_in_queue.empty():
-            chunks.append(self.audio_in_queue.get_nowait())
-        
-        all_audio = b"".join(chunks)
-        audio_array = np.frombuffer(all_audio, dtype=np.int16)
+        # View the accumulated buffer directly; no join or extra copy.
+        audio_array = np.frombuffer(self.audio_buf, dtype=np.int16)
         
         sd.play(audio_array, samplerate=RECEIVE_SAMPLE_RATE)
         sd.wait()
@@ -44,13 +44,21 @@ pya = pyaudio.PyAudio()
 
 class SimpleAudioTest:
     def __init__(self):
-        self.audio_in_queue = None
+        self.audio_buf = bytearray()
+        self.audio_ready = None
         self.out_queue = None
         self.session = None
         self.audio_stream = None
 
     async def listen_audio(self):
         """Capture microphone audio."""
+        loop = asyncio.get_running_loop()
+        mic_queue: asyncio.Queue[bytes] = asyncio.Queue()
+
+        def callback(in_data, frame_count, time_info, status):
+            loop.call_soon_threadsafe(mic_queue.put_nowait, in_data)
+            return (None, pyaudio.paContinue)
+
         mic_info = pya.get_default_input_device_info()
         self.audio_stream = await asyncio.to_thread(
             pya.open,
@@ -60,12 +68,11 @@ class SimpleAudioTest:
             input=True,
             input_device_index=mic_info["index"],
             frames_per_buffer=CHUNK_SIZE,
+            stream_callback=callback,
         )
         print("🎤 Microphone active - SPEAK NOW!")
         while True:
-            data = await asyncio.to_thread(
-                self.audio_stream.read, CHUNK_SIZE, exception_on_overflow=False
-            )
+            data = await mic_queue.get()
             await self.out_queue.put({"data": data, "mime_type": "audio/pcm"})
 
     async def send_realtime(self):
@@ -82,12 +89,12 @@ class SimpleAudioTest:
             async for response in turn:
                 if data := response.data:
                     print(f"📢 Received audio: {len(data)} bytes")
-                    self.audio_in_queue.put_nowait(data)
+                    self.audio_buf.extend(data)
+                    self.audio_ready.set()
                 if text := response.text:
                     print(f"💬 Text: {text}")
-            # On turn complete, clear queue (for interruption support)
-            while not self.audio_in_queue.empty():
-                self.audio_in_queue.get_nowait()
+            # On turn complete, drop pending audio (for interruption support)
+            self.audio_buf.clear()
 
     async def play_audio(self):
         """Play received audio."""
@@ -99,8 +106,13 @@ class SimpleAudioTest:
             output=True,
         )
         while True:
-            bytestream = await self.audio_in_queue.get()
-            await asyncio.to_thread(stream.write, bytestream)
+            await self.audio_ready.wait()
+            self.audio_ready.clear()
+            if not self.audio_buf:
+                continue
+            # Swap buffers so playback takes everything received so far.
+            bytestream, self.audio_buf = self.audio_buf, bytearray()
+            await asyncio.to_thread(stream.write, bytes(bytestream))
 
     async def run(self):
         print(f"🔌 Connecting to Gemini Live: {MODEL}")
@@ -110,7 +122,7 @@ class SimpleAudioTest:
                 asyncio.TaskGroup() as tg,
             ):
                 self.session = session
-                self.audio_in_queue = asyncio.Queue()
+                self.audio_ready = asyncio.Event()
                 self.out_queue = asyncio.Queue(maxsize=5)
                 
                 print("✅ Connected! Speak into your microphone.")
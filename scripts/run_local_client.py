@@ -1,24 +1,48 @@
 
 import argparse
 import asyncio
+import json
 import logging
+import socket
 import sys
+import threading
+from collections import deque
 from typing import Optional
 
+import wyoming
 from wyoming.audio import AudioChunk, AudioStart, AudioStop
 from wyoming.client import AsyncTcpClient
 from wyoming.event import Event
 
-# You may need: pip install sounddevice numpy
+from client_utils import set_tcp_nodelay
+
+# You may need: pip install sounddevice
 try:
     import sounddevice as sd
-    import numpy as np
 except ImportError:
-    print("Missing dependencies. Please run: pip install sounddevice numpy")
+    print("Missing dependencies. Please run: pip install sounddevice")
     sys.exit(1)
 
 _LOGGER = logging.getLogger("client")
 
+
+def audio_chunk_frame_parts(rate: int):
+    """Pre-encode the constant parts of a Wyoming audio-chunk event.
+
+    Returns a function mapping a PCM payload to the list of buffers to write,
+    so the mic loop skips AudioChunk(...).event() and its JSON dumps per send.
+    """
+    data = json.dumps({"rate": rate, "width": 2, "channels": 1, "timestamp": 0}).encode()
+    prefix = json.dumps(
+        {"type": "audio-chunk", "version": wyoming.__version__, "data_length": len(data)}
+    )[:-1].encode() + b', "payload_length": '
+
+    def frame(audio: bytes) -> list[bytes]:
+        return [prefix, str(len(audio)).encode(), b"}\n", data, audio]
+
+    return frame
+
+
 async def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--host", help="Host IP (optional, defaults to auto-discovery)")
@@ -40,34 +64,46 @@ async def main():
             return
     else:
         # Auto-discovery
-        from zeroconf import Zeroconf, ServiceBrowser
-        import time
+        from zeroconf import ServiceStateChange
+        from zeroconf.asyncio import AsyncServiceBrowser, AsyncServiceInfo, AsyncZeroconf
         
         print("Scanning for Wyoming servers (mDNS)...")
-        zeroconf = Zeroconf()
+        aiozc = AsyncZeroconf()
         discovered = []
+        discovered_event = asyncio.Event()
+        resolving: set[asyncio.Task] = set()
 
-        class Listener:
-            def remove_service(self, zeroconf, type, name):
-                pass
-            def add_service(self, zeroconf, type, name):
-                info = zeroconf.get_service_info(type, name)
-                if info and info.addresses:
-                    # Convert bytes IP to string
-                    import socket
-                    ip = socket.inet_ntoa(info.addresses[0])
-                    discovered.append((ip, info.port, name))
-                    
-        browser = ServiceBrowser(zeroconf, "_wyoming._tcp.local.", Listener())
+        async def resolve(service_type, name):
+            info = AsyncServiceInfo(service_type, name)
+            if await info.async_request(aiozc.zeroconf, 3000) and info.addresses:
+                # Convert bytes IP to string
+                ip = socket.inet_ntoa(info.addresses[0])
+                discovered.append((ip, info.port, name))
+                discovered_event.set()
+
+        def on_service_state_change(zeroconf, service_type, name, state_change):
+            # Runs on the event loop; resolve without blocking it.
+            if state_change is ServiceStateChange.Added:
+                task = asyncio.ensure_future(resolve(service_type, name))
+                resolving.add(task)
+                task.add_done_callback(resolving.discard)
+
+        browser = AsyncServiceBrowser(
+            aiozc.zeroconf, "_wyoming._tcp.local.", handlers=[on_service_state_change]
+        )
+
+        async def close_zeroconf():
+            await browser.async_cancel()
+            await aiozc.async_close()
         
-        # Scan for 3 seconds
-        end_time = time.time() + 3
-        while time.time() < end_time and not discovered:
-            await asyncio.sleep(0.5)
+        # Wait up to 3 seconds for the first reply
+        try:
+            await asyncio.wait_for(discovered_event.wait(), timeout=3.0)
+        except asyncio.TimeoutError:
+            pass
             
-        zeroconf.close()
-        
         if not discovered:
+            await close_zeroconf()
             print("No Wyoming services found via discovery. Try specifying --host.")
             return
             
@@ -76,58 +112,77 @@ async def main():
         print(f"Discovered {name} at {host}:{port}")
         
         client = AsyncTcpClient(host, port)
+        # Tear down mDNS while the TCP connection is being set up; the
+        # teardown is always awaited, even if connecting fails.
+        zeroconf_closed = asyncio.create_task(close_zeroconf())
         try:
             await client.connect()
             print("Connected! Speak into your microphone.")
         except ConnectionRefusedError:
             print(f"Error: Could not connect to {host}:{port}.")
             return
+        finally:
+            await zeroconf_closed
 
 
     
-    # Send AudioStart
-    await client.write_event(AudioStart(rate=args.rate, width=2, channels=1).event())
-    
+    set_tcp_nodelay(client)
+
     loop = asyncio.get_running_loop()
     stop_event = asyncio.Event()
 
     # Queue for outgoing audio
     audio_queue = asyncio.Queue()
+    send_bytes = 4 * 1024 * 2  # coalesce 4 mic blocks per AudioChunk
 
-    def audio_callback(indata, outdata, frames, time, status):
-        """Callback for sounddevice."""
+    def audio_callback(indata, frames, time, status):
+        """Callback for sounddevice (runs on the PortAudio thread)."""
         if status:
             print(status, file=sys.stderr)
-        
+
         # Put microphone data into queue
         loop.call_soon_threadsafe(audio_queue.put_nowait, bytes(indata))
-        
-        # We don't play audio here; we play it when we receive it from network
-        # But sounddevice stream is duplex. We need a way to feed 'outdata'.
-        # For simplicity, we'll use a globally managed buffer or queue for playback
-        # if using a full duplex stream.
-        # However, to keep it simple, let's just record/send.
-        # Playback is tricky in callback if we don't have the data ready.
-        outdata.fill(0)
-
-    # Simplified approach: Separate streams for read/write might be easier, 
-    # but duplex ensures sync.
-    # To handle playback, we'll use a separate output stream or queue.
-    # Let's try to just send audio for now and print received events.
-    
-    # Better demo: Just use raw input/output streams with sounddevice in blocking mode
-    # inside async executor? No.
-    
-    # Real "chat" feel needs simultaneous mic and speaker.
-    # Let's use two streams.
-    
+
+    # Separate streams for mic and speaker, both callback-driven so the
+    # event loop never blocks on PortAudio.
+
+    # Playback queue: receive_loop appends, the speaker callback drains.
+    # Unbounded on purpose: the server sends speech faster than real time,
+    # and evicting the oldest entries would cut audio that is about to play.
+    playback: deque[bytes] = deque()
+    playback_lock = threading.Lock()
+
+    def playback_callback(outdata, frames, time, status):
+        """Fill the speaker buffer from the playback ring, padding with silence."""
+        need = len(outdata)
+        filled = 0
+        with playback_lock:
+            while filled < need and playback:
+                chunk = playback[0]
+                take = min(need - filled, len(chunk))
+                outdata[filled:filled + take] = chunk[:take]
+                if take == len(chunk):
+                    playback.popleft()
+                else:
+                    playback[0] = chunk[take:]
+                filled += take
+        if filled < need:
+            outdata[filled:] = bytes(need - filled)
+
     # Output Stream (Speaker)
-    output_stream = sd.OutputStream(
+    output_stream = sd.RawOutputStream(
         samplerate=args.rate,
         channels=1,
         dtype='int16',
+        blocksize=1024,
+        callback=playback_callback,
+    )
+
+    # Send AudioStart while PortAudio opens the speaker
+    await asyncio.gather(
+        client.write_event(AudioStart(rate=args.rate, width=2, channels=1).event()),
+        loop.run_in_executor(None, output_stream.start),
     )
-    output_stream.start()
     
     async def receive_loop():
         """Receive audio from server and play it."""
@@ -140,9 +195,10 @@ async def main():
                 break
             
             if AudioChunk.is_type(event.type):
-                chunk = AudioChunk.from_event(event)
-                # Play audio
-                output_stream.write(np.frombuffer(chunk.data, dtype=np.int16))
+                # Hand the raw payload to the speaker callback (already int16 PCM)
+                if event.payload:
+                    with playback_lock:
+                        playback.append(event.payload)
             elif AudioStop.is_type(event.type):
                 print("Audio Stop received")
             else:
@@ -153,22 +209,27 @@ async def main():
     
     async def mic_loop():
         print("Microphone active. Speak now! (Ctrl+C to stop)")
-        input_stream = sd.InputStream(
+        input_stream = sd.RawInputStream(
             samplerate=args.rate,
             channels=1,
             dtype='int16',
-            blocksize=1024
+            blocksize=1024,
+            callback=audio_callback,
         )
         input_stream.start()
         
+        # Header is identical for every chunk; only the payload varies.
+        frame = audio_chunk_frame_parts(args.rate)
+        writer = client._writer
+
+        accum = bytearray()
         while not stop_event.is_set():
-            # Blocking read, run in executor
-            data, overflow = await loop.run_in_executor(None, input_stream.read, 1024)
-            if overflow:
-                print("Audio overflow")
-                
-            chunk = AudioChunk(rate=args.rate, width=2, channels=1, audio=bytes(data), timestamp=0)
-            await client.write_event(chunk.event())
+            accum.extend(await audio_queue.get())
+            if len(accum) < send_bytes:
+                continue
+            writer.writelines(frame(bytes(accum)))
+            await writer.drain()
+            accum.clear()
             
     # Run both
     tasks = [
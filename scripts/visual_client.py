@@ -6,10 +6,21 @@ import sys
 import json
 import time
 import math
+import threading
+from collections import deque
 from aiohttp import web
 from wyoming.audio import AudioChunk, AudioStart, AudioStop
 from wyoming.client import AsyncTcpClient
 
+from client_utils import set_tcp_nodelay
+
+# Optional: orjson serializes straight to bytes, several times faster than json.
+try:
+    from orjson import dumps as dumps_bytes
+except ImportError:
+    def dumps_bytes(obj):
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 _LOGGER = logging.getLogger("visual_client")
@@ -27,36 +38,98 @@ state = {
     "gemini_level": 0.0,
     "status": "Disconnected",
     "is_talking": False,
-    "logs": []
+    "logs": deque(maxlen=20)
 }
 
 websockets = set()
 mic_event = asyncio.Event()
 
+# State is pushed on a fixed tick (~30 Hz); identical payloads are skipped.
+BROADCAST_INTERVAL = 0.033
+_last_payload = None
+
 def add_log(msg):
     _LOGGER.info(msg)
     state["logs"].append(f"{time.strftime('%H:%M:%S')} {msg}")
-    if len(state["logs"]) > 20:
-        state["logs"].pop(0)
+
+async def _safe_send(ws, data):
+    """Send pre-encoded UTF-8 JSON to one client; return the socket if it failed, else None."""
+    try:
+        if hasattr(ws, "send_frame"):
+            # aiohttp >= 3.11: ship the already-encoded bytes as a TEXT frame.
+            await ws.send_frame(data, web.WSMsgType.TEXT)
+        else:
+            await ws.send_str(data.decode("utf-8"))
+    except Exception:
+        return ws
+    return None
+
+def state_payload():
+    # Quantize levels so sub-visible jitter doesn't produce a new payload.
+    snapshot = {
+        **state,
+        "mic_level": round(state["mic_level"], 2),
+        "gemini_level": round(state["gemini_level"], 2),
+        "logs": list(state["logs"]),
+    }
+    return dumps_bytes({"type": "state", "data": snapshot})
 
 async def broadcast_state():
+    global _last_payload
     if not websockets:
         return
-    data = json.dumps({"type": "state", "data": state})
-    for ws in list(websockets):
-        try:
-            await ws.send_str(data)
-        except Exception:
-            websockets.discard(ws)
+    data = state_payload()
+    if data == _last_payload:
+        return
+
+    _last_payload = data
+    # Encoded once; fan out concurrently so one slow client doesn't stall the rest.
+    results = await asyncio.gather(*(_safe_send(ws, data) for ws in list(websockets)))
+    websockets.difference_update(ws for ws in results if ws is not None)
+
+async def ws_tick():
+    """Sample the shared state and push it at a bounded rate."""
+    while True:
+        await asyncio.sleep(BROADCAST_INTERVAL)
+        await broadcast_state()
+
+# Optional: numba compiles the RMS kernel to a single native loop.
+try:
+    from numba import njit, types as nb_types
+except ImportError:
+    njit = None
+
+if njit is not None:
+    # Eager signatures (read-only views from bytes, writable mic buffers) avoid first-call JIT.
+    @njit(
+        [
+            nb_types.float64(nb_types.Array(nb_types.int16, 1, "C", readonly=True)),
+            nb_types.float64(nb_types.Array(nb_types.int16, 1, "C")),
+        ],
+        cache=True,
+        fastmath=True,
+    )
+    def _rms_i16(x):
+        s = 0
+        for i in range(x.size):
+            v = np.int64(x[i])
+            s += v * v
+        return math.sqrt(s / x.size) / 32768.0
+else:
+    def _rms_i16(x):
+        # Integer sum of squares: no float32 temporary, one reduction pass.
+        s64 = x.astype(np.int64)
+        return math.sqrt(int(s64 @ s64) / x.size) / 32768.0
 
 def calculate_rms(data):
-    """Calculate RMS amplitude from bytes."""
-    samples = np.frombuffer(data, dtype=np.int16)
-    if len(samples) == 0:
+    """Calculate RMS amplitude from bytes or an int16 ndarray."""
+    if isinstance(data, np.ndarray):
+        samples = np.ascontiguousarray(data.view(np.int16).reshape(-1))
+    else:
+        samples = np.frombuffer(data, dtype=np.int16)
+    if samples.size == 0:
         return 0.0
-    floats = samples.astype(np.float32) / 32768.0
-    rms = np.sqrt(np.mean(floats**2))
-    return float(rms)
+    return float(_rms_i16(samples))
 
 async def web_handler(request):
     with open("scripts/web/index.html", "r") as f:
@@ -66,7 +139,8 @@ async def ws_handler(request):
     ws = web.WebSocketResponse()
     await ws.prepare(request)
     websockets.add(ws)
-    await broadcast_state()
+    # New clients always get the current state, even if nothing changed.
+    await _safe_send(ws, state_payload())
     try:
         async for msg in ws:
             if msg.type == web.WSMsgType.TEXT:
@@ -105,6 +179,7 @@ async def main():
     client = AsyncTcpClient(args.host, args.port)
     try:
         await client.connect()
+        set_tcp_nodelay(client)
         state["status"] = "Connected"
         add_log("Connected to Wyoming Server")
     except Exception as e:
@@ -115,9 +190,29 @@ async def main():
     loop = asyncio.get_running_loop()
     stop_event = asyncio.Event()
 
-    # Output Audio Stream
+    # Output Audio Stream: the device pulls from this buffer on its own clock,
+    # so receive_loop never blocks on a PortAudio write.
+    playback = deque()
+    playback_lock = threading.Lock()
+
+    def playback_callback(outdata, frames, time_info, status):
+        out = outdata[:, 0]
+        filled = 0
+        with playback_lock:
+            while filled < frames and playback:
+                block = playback[0]
+                take = min(frames - filled, block.size)
+                out[filled:filled + take] = block[:take]
+                if take == block.size:
+                    playback.popleft()
+                else:
+                    playback[0] = block[take:]
+                filled += take
+        out[filled:] = 0  # underrun -> silence
+
     output_stream = sd.OutputStream(
-        samplerate=args.rate, channels=1, dtype='int16', latency='low'
+        samplerate=args.rate, channels=1, dtype='int16', latency='low',
+        blocksize=1024, callback=playback_callback,
     )
     output_stream.start()
 
@@ -142,16 +237,18 @@ async def main():
 
                 if AudioChunk.is_type(event.type):
                     try:
-                        chunk = AudioChunk.from_event(event) 
-                        audio_data = chunk.audio
+                        # Raw payload; skip building an AudioChunk dataclass.
+                        audio_data = event.payload or b""
                         _LOGGER.info(f"Received AudioChunk: {len(audio_data)} bytes")
                         
-                        rms = calculate_rms(audio_data)
+                        # One int16 view shared by the level meter and playback.
+                        samples = np.frombuffer(audio_data, dtype=np.int16)
+                        rms = calculate_rms(samples)
                         state["gemini_level"] = min(rms * 5, 1.0)
                         
-                        # Use a small buffer to avoid blocking the loop too much
-                        # but write it out to the stream.
-                        output_stream.write(np.frombuffer(audio_data, dtype=np.int16))
+                        # Hand off to the output callback; no blocking write.
+                        with playback_lock:
+                            playback.append(samples)
                     except Exception as e:
                          _LOGGER.error(f"Error processing AudioChunk: {e}")
                 elif AudioStart.is_type(event.type):
@@ -161,51 +258,63 @@ async def main():
                     state["gemini_level"] = 0.0
                 else:
                      _LOGGER.info(f"Ignored event: {event.type}")
-
-                await broadcast_state()
         except Exception as e:
             _LOGGER.error(f"CRITICAL: receive_loop crashed: {e}")
             add_log(f"Receiver crashed: {e}")
 
+    # Mic blocks arrive from the PortAudio thread; keep only the freshest few.
+    mic_queue = asyncio.Queue(maxsize=8)
+
+    def enqueue_mic(block):
+        if mic_queue.full():
+            mic_queue.get_nowait()
+        mic_queue.put_nowait(block)
+
+    def mic_callback(indata, frames, time_info, status):
+        loop.call_soon_threadsafe(enqueue_mic, indata.tobytes())
+
     async def mic_loop():
         input_stream = sd.InputStream(
-            samplerate=args.rate, channels=1, dtype='int16', blocksize=1024
+            samplerate=args.rate, channels=1, dtype='int16', blocksize=1024,
+            latency='low', callback=mic_callback,
         )
         input_stream.start()
         
         chunk_info = AudioChunk(rate=args.rate, width=2, channels=1, audio=b"", timestamp=0)
+        # Start/stop events never change; build them once.
+        audio_start_evt = AudioStart(rate=args.rate, width=2, channels=1).event()
+        audio_stop_evt = AudioStop().event()
 
         while not stop_event.is_set():
             # Wait for "Talking" state
             if not state["is_talking"]:
                 state["mic_level"] = 0.0
-                await broadcast_state()
                 await mic_event.wait()
+                # Drop audio captured while idle
+                while not mic_queue.empty():
+                    mic_queue.get_nowait()
                 # Once activated, send Start
                 add_log("Mic Started (Sending AudioStart)")
-                await client.write_event(AudioStart(rate=args.rate, width=2, channels=1).event())
+                await client.write_event(audio_start_evt)
 
             # Read audio
-            data, overflow = await loop.run_in_executor(None, input_stream.read, 1024)
-            if overflow: pass
+            data = await mic_queue.get()
             
-            rms = calculate_rms(bytes(data))
+            rms = calculate_rms(data)
             state["mic_level"] = min(rms * 5, 1.0)
             
             # Send chunk if talking
             if state["is_talking"]:
-                chunk_info.audio = bytes(data)
+                chunk_info.audio = data
                 await client.write_event(chunk_info.event())
             else:
                 # Just stopped talking
                 add_log("Mic Stopped (Sending AudioStop)")
-                await client.write_event(AudioStop().event())
+                await client.write_event(audio_stop_evt)
                 # prevent spamming STOP
                 mic_event.clear()
 
-            await broadcast_state()
-
-    await asyncio.gather(receive_loop(), mic_loop())
+    await asyncio.gather(receive_loop(), mic_loop(), ws_tick())
 
 if __name__ == "__main__":
     try:
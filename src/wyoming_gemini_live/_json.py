@@ -0,0 +1,12 @@
+"""JSON decoding shim: orjson when installed (the ``fast`` extra), else stdlib json.
+
+Both accept ``str`` or ``bytes`` and raise a ``ValueError`` subclass on bad input.
+"""
+from __future__ import annotations
+
+try:
+    from orjson import loads
+except ImportError:
+    from json import loads
+
+__all__ = ["loads"]
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import functools
 import math
 from dataclasses import dataclass
 from typing import Iterable, Iterator
@@ -13,6 +14,29 @@ PCM16_MAX = np.iinfo(PCM16_DTYPE).max
 PCM16_MIN = np.iinfo(PCM16_DTYPE).min
 
 
+@functools.lru_cache(maxsize=16)
+def _ratio(src_rate_hz: int, dst_rate_hz: int) -> tuple[int, int]:
+    """Reduced (up, down) factors for a rate pair."""
+    g = math.gcd(src_rate_hz, dst_rate_hz)
+    return dst_rate_hz // g, src_rate_hz // g
+
+
+@functools.lru_cache(maxsize=16)
+def _design_filter(up: int, down: int) -> tuple[np.ndarray, int]:
+    """Polyphase FIR taps matching scipy's ``resample_poly`` defaults.
+
+    Returns the (pre-padded, float32) taps and how many leading output samples
+    to discard to compensate for the filter delay.
+    """
+    max_rate = max(up, down)
+    half_len = 10 * max_rate
+    h = signal.firwin(2 * half_len + 1, 1.0 / max_rate, window=("kaiser", 5.0)) * up
+    n_pre_pad = down - half_len % down
+    h = np.concatenate((np.zeros(n_pre_pad), h)).astype(np.float32)
+    h.setflags(write=False)
+    return h, (half_len + n_pre_pad) // down
+
+
 def resample_pcm16(
     pcm: bytes,
     src_rate_hz: int,
@@ -29,18 +53,90 @@ def resample_pcm16(
 
     x = np.frombuffer(pcm, dtype=PCM16_DTYPE).astype(np.float32)
 
-    g = math.gcd(src_rate_hz, dst_rate_hz)
-    up = dst_rate_hz // g
-    down = src_rate_hz // g
+    up, down = _ratio(src_rate_hz, dst_rate_hz)
 
-    # Polyphase resampling. Returns float64 by default; keep float32.
-    y = signal.resample_poly(x, up=up, down=down).astype(np.float32)
+    # Polyphase resampling with cached taps; float32 throughout.
+    h, n_pre_remove = _design_filter(up, down)
+    n_out = -(-x.size * up // down)
+    y = signal.upfirdn(h, x, up, down)[n_pre_remove : n_pre_remove + n_out]
+    if y.size < n_out:
+        y = np.pad(y, (0, n_out - y.size))
 
-    # Clip to int16 range
-    y = np.clip(y, PCM16_MIN, PCM16_MAX)
+    # Clip to int16 range (in place; y is a fresh buffer)
+    np.clip(y, PCM16_MIN, PCM16_MAX, out=y)
     return y.astype(PCM16_DTYPE).tobytes()
 
 
+@functools.lru_cache(maxsize=32)
+def _silence(n_samples: int) -> bytes:
+    """Zeroed PCM16 buffer; immutable, so safe to share between callers."""
+    return bytes(2 * n_samples)
+
+
+class PolyphaseResampler:
+    """Streaming PCM16 mono resampler that carries FIR state across chunks.
+
+    ``resample_pcm16`` treats every chunk as an isolated signal, so the filter
+    ramps up from zero at each boundary (audible as clicks). This keeps the
+    tail of the previous input as the filter's delay line instead. Output lags
+    the input by the filter's group delay (well under 1 ms for 16k/24k).
+    """
+
+    def __init__(self, src_rate_hz: int, dst_rate_hz: int) -> None:
+        self.src_rate_hz = src_rate_hz
+        self.dst_rate_hz = dst_rate_hz
+
+        self._up, self._down = _ratio(src_rate_hz, dst_rate_hz)
+        if self._up != self._down:
+            self._h, self._n_pre_remove = _design_filter(self._up, self._down)
+            # Input samples of history needed to cover the whole filter.
+            self._history = -(-self._h.size // self._up)
+        self._out_i16 = np.empty(0, dtype=PCM16_DTYPE)
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget buffered history (e.g. at the start of a new stream)."""
+        self._tail = np.zeros(0, dtype=np.float32)
+        self._tail_start = 0  # absolute input index of _tail[0]
+        self._in_count = 0  # total input samples seen
+        self._next_out = 0  # next output index (pre-delay-removal) to emit
+
+    def process(self, pcm: bytes | bytearray) -> bytes:
+        if self._up == self._down:
+            return bytes(pcm)  # no copy for bytes; snapshot for a bytearray
+        if not pcm:
+            return b""
+
+        x_new = np.frombuffer(pcm, dtype=PCM16_DTYPE).astype(np.float32)
+        x = np.concatenate((self._tail, x_new))
+        base = self._tail_start
+        self._in_count += x_new.size
+
+        # Outputs whose newest input sample is already known.
+        end_out = -(-self._in_count * self._up // self._down)
+        start_out = max(self._next_out, self._n_pre_remove)
+        self._next_out = end_out
+
+        # base is kept a multiple of `down`, so upfirdn's phase lines up with
+        # the absolute output index.
+        offset = base * self._up // self._down
+        y = signal.upfirdn(self._h, x, self._up, self._down)[start_out - offset : end_out - offset]
+
+        # Keep enough history for the next call, aligned to `down`.
+        keep_from = max(0, self._in_count - self._history)
+        keep_from -= keep_from % self._down
+        self._tail = x[keep_from - base :]
+        self._tail_start = keep_from
+
+        # Clip in place, then convert into a reused int16 scratch buffer.
+        np.clip(y, PCM16_MIN, PCM16_MAX, out=y)
+        if self._out_i16.size < y.size:
+            self._out_i16 = np.empty(y.size, dtype=PCM16_DTYPE)
+        out = self._out_i16[: y.size]
+        np.copyto(out, y, casting="unsafe")
+        return out.tobytes()
+
+
 def iter_silence_chunks(
     duration_ms: int,
     sample_rate_hz: int,
@@ -50,11 +146,11 @@ def iter_silence_chunks(
     if duration_ms <= 0:
         return
     total_samples = int((duration_ms / 1000.0) * sample_rate_hz)
-    silence = np.zeros(chunk_size_samples, dtype=PCM16_DTYPE).tobytes()
+    silence = _silence(chunk_size_samples)
     full_chunks = total_samples // chunk_size_samples
     remainder = total_samples % chunk_size_samples
 
     for _ in range(full_chunks):
         yield silence
     if remainder:
-        yield np.zeros(remainder, dtype=PCM16_DTYPE).tobytes()
+        yield _silence(remainder)
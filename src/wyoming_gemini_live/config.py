@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import fnmatch
+import functools
 import json
 import os
+import re
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Mapping, Sequence
@@ -27,10 +30,36 @@ def _first(*values: str | None) -> str | None:
     return None
 
 
+def _int_opt(options: Mapping[str, Any], env_name: str, key: str | None, default: int) -> int:
+    """Integer setting from env var, then add-on option, then default."""
+    raw = _first(_env(env_name), str(options[key]) if key and key in options else None)
+    try:
+        return int(raw) if raw else default
+    except Exception:
+        return default
+
+
+def _list_opt(options: Mapping[str, Any], env_name: str, key: str) -> list[str]:
+    """List setting from add-on option (JSON list), else a CSV env var."""
+    value = options.get(key)
+    if isinstance(value, list):
+        return [str(x) for x in value]
+    return _split_csv(_env(env_name))
+
+
+def _compile_globs(patterns: Sequence[str]) -> re.Pattern[str] | None:
+    """Fold entity_id globs into one regex, once, at settings load (None if empty)."""
+    if not patterns:
+        return None
+    return re.compile("|".join(fnmatch.translate(p) for p in patterns))
+
+
+@functools.lru_cache(maxsize=1)
 def load_addon_options(path: Path = _ADDON_OPTIONS_PATH) -> dict[str, Any]:
     """Load Home Assistant add-on options (if running under HAOS).
 
     HA add-ons commonly expose configuration via /data/options.json.
+    The file is only read once per process; treat the result as read-only.
     """
     if not path.exists():
         return {}
@@ -56,17 +85,20 @@ class Settings:
     ha_token: str = ""
 
     # Context / tools
-    allowed_domains: tuple[str, ...] = (
-        "light",
-        "switch",
-        "cover",
-        "climate",
-        "lock",
-        "scene",
-        "script",
+    allowed_domains: frozenset[str] = frozenset(
+        (
+            "light",
+            "switch",
+            "cover",
+            "climate",
+            "lock",
+            "scene",
+            "script",
+        )
     )
-    entity_allowlist: tuple[str, ...] = ()
-    entity_blocklist: tuple[str, ...] = ()
+    # Precompiled entity_id globs, one alternation per list (see _compile_globs)
+    entity_allowlist: re.Pattern[str] | None = None
+    entity_blocklist: re.Pattern[str] | None = None
     max_context_entities: int = 200
 
     # Audio
@@ -84,19 +116,19 @@ class Settings:
     @staticmethod
     def from_env_and_addon_options() -> "Settings":
         options = load_addon_options()
+        if not isinstance(options, Mapping):
+            options = {}
 
         gemini_api_key = _first(
             _env("GEMINI_API_KEY"),
             _env("GOOGLE_API_KEY"),
-            options.get("gemini_api_key") if isinstance(options, Mapping) else None,
-        )
-        if not gemini_api_key:
-            gemini_api_key = ""
+            options.get("gemini_api_key"),
+        ) or ""
 
         ha_token = _first(
             _env("HA_TOKEN"),
             _env("SUPERVISOR_TOKEN"),
-            options.get("ha_token") if isinstance(options, Mapping) else None,
+            options.get("ha_token"),
         )
         if not ha_token:
             print("DEBUG: No HA_TOKEN or SUPERVISOR_TOKEN found in environment/options.")
@@ -105,106 +137,37 @@ class Settings:
             masked = ha_token[:4] + "..." + ha_token[-4:] if len(ha_token) > 8 else "***"
             print(f"DEBUG: Found HA token: {masked}")
 
-        ha_url = _first(
-            _env("HA_URL"),
-            options.get("ha_url") if isinstance(options, Mapping) else None,
-            "http://homeassistant.local:8123",
-        ) or "http://homeassistant.local:8123"
+        ha_url = _first(_env("HA_URL"), options.get("ha_url")) or "http://homeassistant.local:8123"
         print(f"DEBUG: Using HA URL: {ha_url}")
 
-        model = _first(
-            _env("MODEL"),
-            options.get("model") if isinstance(options, Mapping) else None,
-            "gemini-2.5-flash-native-audio-preview-12-2025",
-        ) or "gemini-2.5-flash-native-audio-preview-12-2025"
-
-        log_level = _first(
-            _env("LOG_LEVEL"),
-            options.get("log_level") if isinstance(options, Mapping) else None,
-            "info",
-        ) or "info"
-
-        # Port
-        port_str = _first(_env("PORT"), str(options.get("port")) if isinstance(options, Mapping) and "port" in options else None)
-        try:
-            port = int(port_str) if port_str else 10700
-        except Exception:
-            port = 10700
+        model = _first(_env("MODEL"), options.get("model")) or "gemini-2.5-flash-native-audio-preview-12-2025"
+        log_level = _first(_env("LOG_LEVEL"), options.get("log_level")) or "info"
 
         # Allowed domains
-        allowed_domains: Sequence[str] | None = None
-        if isinstance(options, Mapping) and isinstance(options.get("allowed_domains"), list):
-            allowed_domains = [str(x) for x in options["allowed_domains"]]
-        else:
-            allowed_domains = _split_csv(_env("ALLOWED_DOMAINS"))
-
+        allowed_domains = _list_opt(options, "ALLOWED_DOMAINS", "allowed_domains")
         if not allowed_domains:
             allowed_domains = ["light", "switch", "cover", "climate", "lock", "scene", "script"]
 
         # Allow/block patterns
-        if isinstance(options, Mapping) and isinstance(options.get("entity_allowlist"), list):
-            entity_allowlist = tuple(str(x) for x in options["entity_allowlist"])
-        else:
-            entity_allowlist = tuple(_split_csv(_env("ENTITY_ALLOWLIST")))
-
-        if isinstance(options, Mapping) and isinstance(options.get("entity_blocklist"), list):
-            entity_blocklist = tuple(str(x) for x in options["entity_blocklist"])
-        else:
-            entity_blocklist = tuple(_split_csv(_env("ENTITY_BLOCKLIST")))
-
-        # Max context entities
-        max_ctx_str = _first(
-            _env("MAX_CONTEXT_ENTITIES"),
-            str(options.get("max_context_entities")) if isinstance(options, Mapping) and "max_context_entities" in options else None,
-        )
-        try:
-            max_context_entities = int(max_ctx_str) if max_ctx_str else 200
-        except Exception:
-            max_context_entities = 200
-
-        # Silence tail (ms)
-        silence_tail_str = _first(_env("SILENCE_TAIL_MS"), str(options.get("silence_tail_ms")) if isinstance(options, Mapping) and "silence_tail_ms" in options else None)
-        try:
-            silence_tail_ms = int(silence_tail_str) if silence_tail_str else 600
-        except Exception:
-            silence_tail_ms = 600
-
-        # Chunk size (samples)
-        chunk_str = _first(_env("AUDIO_CHUNK_SIZE"), str(options.get("audio_chunk_size")) if isinstance(options, Mapping) and "audio_chunk_size" in options else None)
-        try:
-            audio_chunk_size = int(chunk_str) if chunk_str else 1024
-        except Exception:
-            audio_chunk_size = 1024
-
-        # Audio rates
-        in_rate_str = _first(_env("INPUT_SAMPLE_RATE_HZ"))
-        out_rate_str = _first(_env("OUTPUT_SAMPLE_RATE_HZ"))
-
-        try:
-            input_rate = int(in_rate_str) if in_rate_str else 16000
-        except Exception:
-            input_rate = 16000
-
-        try:
-            output_rate = int(out_rate_str) if out_rate_str else 16000
-        except Exception:
-            output_rate = 16000
+        entity_allowlist = _compile_globs(_list_opt(options, "ENTITY_ALLOWLIST", "entity_allowlist"))
+        entity_blocklist = _compile_globs(_list_opt(options, "ENTITY_BLOCKLIST", "entity_blocklist"))
 
         return Settings(
             host="0.0.0.0",
-            port=port,
+            port=_int_opt(options, "PORT", "port", 10700),
             gemini_api_key=gemini_api_key,
             model=model,
             gemini_api_version="v1beta",
             ha_url=ha_url,
             ha_token=ha_token,
-            allowed_domains=tuple(allowed_domains),
+            allowed_domains=frozenset(allowed_domains),
             entity_allowlist=entity_allowlist,
             entity_blocklist=entity_blocklist,
-            max_context_entities=max_context_entities,
-            input_sample_rate_hz=input_rate,
-            output_sample_rate_hz=output_rate,
-            silence_tail_ms=silence_tail_ms,
-            audio_chunk_size=audio_chunk_size,
+            max_context_entities=_int_opt(options, "MAX_CONTEXT_ENTITIES", "max_context_entities", 200),
+            # Audio rates are env-only
+            input_sample_rate_hz=_int_opt(options, "INPUT_SAMPLE_RATE_HZ", None, 16000),
+            output_sample_rate_hz=_int_opt(options, "OUTPUT_SAMPLE_RATE_HZ", None, 16000),
+            silence_tail_ms=_int_opt(options, "SILENCE_TAIL_MS", "silence_tail_ms", 600),
+            audio_chunk_size=_int_opt(options, "AUDIO_CHUNK_SIZE", "audio_chunk_size", 1024),
             log_level=log_level,
         )
@@ -1,16 +1,19 @@
 from __future__ import annotations
 
 import asyncio
-import json
+import collections
+import concurrent.futures
 import logging
 import time
+from base64 import urlsafe_b64encode
 from dataclasses import dataclass
 from typing import Any, Awaitable, Callable, Mapping, Optional
 
 from google import genai
 from google.genai import types
 
-from .audio import iter_silence_chunks, resample_pcm16
+from ._json import loads as _json_loads
+from .audio import PolyphaseResampler, iter_silence_chunks
 from .config import Settings
 from .ha import HomeAssistantClient
 from .prompts import build_system_prompt
@@ -19,12 +22,24 @@ from .tools import build_tools
 
 _LOGGER = logging.getLogger(__name__)
 
+# How long a built LiveConnectConfig (incl. the HA entity snapshot in the
+# system prompt) is reused across reconnects.
+_CONFIG_TTL_S = 30.0
+
+# Most input chunks _send_loop merges into one Gemini frame when backlogged.
+_SEND_BATCH_MAX_CHUNKS = 4
+
+# Static tool-call reply; FunctionResponse copies it on validation, so sharing is safe.
+_UNKNOWN_TOOL_RESPONSE: dict[str, Any] = {"ok": False, "error": "Unknown tool"}
+
 
 @dataclass(frozen=True)
 class OutputAudioCallbacks:
     on_start: Callable[[int], Awaitable[None]]
     on_chunk: Callable[[bytes, int], Awaitable[None]]
     on_stop: Callable[[], Awaitable[None]]
+    # Barge-in: tell the client to discard model audio it has already buffered.
+    on_drop: Optional[Callable[[], Awaitable[None]]] = None
 
 
 class GeminiLiveController:
@@ -45,16 +60,56 @@ class GeminiLiveController:
             api_key=settings.gemini_api_key,
         )
 
-        self._input_audio_queue: asyncio.Queue[bytes] = asyncio.Queue(maxsize=50)
+        # Input audio ring (single producer/consumer); maxlen drops the oldest
+        # chunk when full to keep latency low.
+        self._in_deque: collections.deque[bytes] = collections.deque(maxlen=50)
+        self._in_event = asyncio.Event()
         self._stop_evt = asyncio.Event()
         self._task: asyncio.Task[None] | None = None
+        self._cfg_cache: tuple[float, types.LiveConnectConfig] | None = None
 
         self._output_stream_open = False
         self._last_input_ts = time.monotonic()
 
+        # The end-of-turn silence tail depends only on settings; build it once.
+        self._silence_tail: tuple[bytes, ...] = tuple(
+            iter_silence_chunks(
+                duration_ms=settings.silence_tail_ms,
+                sample_rate_hz=settings.input_sample_rate_hz,
+                chunk_size_samples=settings.audio_chunk_size,
+            )
+        )
+
+        # Streaming resamplers (one per direction) so FIR state carries across chunks.
+        self._in_resampler: PolyphaseResampler | None = None
+        self._out_resampler = PolyphaseResampler(
+            settings.gemini_output_sample_rate_hz, settings.output_sample_rate_hz
+        )
+
+        # Resampling is a NumPy/scipy CPU burst; keep it off the event loop.
+        # One worker keeps calls into each stateful resampler ordered.
+        self._resample_exec = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="resample"
+        )
+
+        # Model audio is coalesced into ~40 ms batches (PCM16 mono at the Gemini
+        # output rate) before resampling and forwarding.
+        self._out_accum = bytearray()
+        self._out_accum_target_bytes = int(0.04 * settings.gemini_output_sample_rate_hz) * 2
+
+        # Model audio handed from _recv_loop to _forward_loop (None = turn end).
+        # Unbounded: the model bursts faster than real time and none of it may
+        # be dropped; barge-in clears it instead.
+        self._out_deque: collections.deque[bytes | bytearray | None] = collections.deque()
+        self._out_event = asyncio.Event()
+
         # If the user starts speaking while the model is speaking,
         # we stop forwarding audio output immediately.
         self._barge_in = False
+        # Bumped on every barge-in; unlike _barge_in (which enqueue_audio clears
+        # on the next mic chunk) it lets an in-flight flush see the barge-in.
+        self._barge_gen = 0
+        self._drop_task: asyncio.Task[None] | None = None
 
     @property
     def running(self) -> bool:
@@ -72,10 +127,30 @@ class GeminiLiveController:
             self._task.cancel()
             await asyncio.gather(self._task, return_exceptions=True)
         self._task = None
+        self._resample_exec.shutdown(wait=False)
 
     def notify_barge_in(self) -> None:
         # Called when the user starts talking.
         self._barge_in = True
+        self._barge_gen += 1
+        # Discard model audio not yet forwarded; the turn-end marker makes the
+        # forwarder close the stream and reset the resampler.
+        self._out_deque.clear()
+        self._out_deque.append(None)
+        self._out_event.set()
+        if self._output_stream_open and self._out.on_drop is not None:
+            # Close the client's output stream now rather than at turn end, so
+            # it can flush its playback buffer; the next model audio re-opens it.
+            self._output_stream_open = False
+            self._drop_task = asyncio.create_task(self._out.on_drop(), name="gemini-output-drop")
+            self._drop_task.add_done_callback(self._on_drop_done)
+
+    @staticmethod
+    def _on_drop_done(task: asyncio.Task[None]) -> None:
+        # Fire-and-forget from notify_barge_in; retrieve the outcome so a
+        # failed AudioStop (e.g. client already gone) is logged, not lost.
+        if not task.cancelled() and task.exception() is not None:
+            _LOGGER.warning("Failed to send barge-in AudioStop: %s", task.exception())
 
     async def enqueue_audio(self, pcm16: bytes, src_rate_hz: int) -> None:
         """Queue audio to send to Gemini (resampling to 16k if needed)."""
@@ -84,62 +159,33 @@ class GeminiLiveController:
         self._barge_in = False  # user is speaking; allow the model to interrupt itself
 
         if src_rate_hz != self._settings.input_sample_rate_hz:
-            pcm16 = resample_pcm16(pcm16, src_rate_hz=src_rate_hz, dst_rate_hz=self._settings.input_sample_rate_hz)
-
-        # If the queue is full, drop oldest to keep latency low.
-        if self._input_audio_queue.full():
-            try:
-                _ = self._input_audio_queue.get_nowait()
-            except Exception:
-                pass
+            resampler = self._in_resampler
+            if resampler is None or resampler.src_rate_hz != src_rate_hz:
+                resampler = PolyphaseResampler(src_rate_hz, self._settings.input_sample_rate_hz)
+                self._in_resampler = resampler
+            pcm16 = await asyncio.get_running_loop().run_in_executor(
+                self._resample_exec, resampler.process, pcm16
+            )
 
-        await self._input_audio_queue.put(pcm16)
+        self._in_deque.append(pcm16)
+        self._in_event.set()
 
     async def end_user_turn(self) -> None:
         """Send a short silence tail so the Live API VAD can close the turn."""
         await self.ensure_running()
-        for chunk in iter_silence_chunks(
-            duration_ms=self._settings.silence_tail_ms,
-            sample_rate_hz=self._settings.input_sample_rate_hz,
-            chunk_size_samples=self._settings.audio_chunk_size,
-        ):
-            # silence is already at 16k
-            if self._input_audio_queue.full():
-                try:
-                    _ = self._input_audio_queue.get_nowait()
-                except Exception:
-                    pass
-            await self._input_audio_queue.put(chunk)
+        if self._in_resampler is not None:
+            # Next utterance is a new stream; don't filter across the gap.
+            self._in_resampler.reset()
+        # silence is already at 16k
+        self._in_deque.extend(self._silence_tail)
+        self._in_event.set()
 
     async def _run(self) -> None:
         if not self._settings.gemini_api_key:
             _LOGGER.error("GEMINI_API_KEY is not set; cannot start Live session.")
             return
 
-        # Build system prompt with HA context injection.
-        entity_lines = await self._ha.build_entity_context_lines(
-            allowed_domains=self._settings.allowed_domains,
-            allowlist=self._settings.entity_allowlist,
-            blocklist=self._settings.entity_blocklist,
-            max_entities=self._settings.max_context_entities,
-        )
-        system_prompt = build_system_prompt(entity_lines)
-
-        tools = build_tools()
-
-        live_config = types.LiveConnectConfig(
-            response_modalities=["AUDIO"],
-            tools=tools,
-            speech_config=types.SpeechConfig(
-                voice_config=types.VoiceConfig(
-                    prebuilt_voice_config=types.PrebuiltVoiceConfig(voice_name="Zephyr")
-                )
-            ),
-            system_instruction=types.Content(
-                role="user",
-                parts=[types.Part.from_text(text=system_prompt)],
-            ),
-        )
+        live_config = await self._get_live_config()
 
         model = self._settings.model
         # Accept both "gemini-..." and "models/gemini-..."
@@ -150,19 +196,50 @@ class GeminiLiveController:
 
         try:
             async with self._client.aio.live.connect(model=model, config=live_config) as session:
+                self._out_deque.clear()
+                # Fresh output state per session: a session that ended mid-turn
+                # (or a flush cancelled mid-resample) can leave audio in the
+                # old accumulator, and its process() may still be running on
+                # _resample_exec against the old resampler.
+                self._out_accum = bytearray()
+                self._out_resampler = PolyphaseResampler(
+                    self._settings.gemini_output_sample_rate_hz, self._settings.output_sample_rate_hz
+                )
                 send_task = asyncio.create_task(self._send_loop(session), name="gemini-send-loop")
                 recv_task = asyncio.create_task(self._recv_loop(session), name="gemini-recv-loop")
+                forward_task = asyncio.create_task(self._forward_loop(), name="gemini-forward-loop")
+                tasks = (send_task, recv_task, forward_task)
+                stop_task = asyncio.create_task(self._stop_evt.wait(), name="gemini-stop-wait")
 
-                await self._stop_evt.wait()
-
-                send_task.cancel()
-                recv_task.cancel()
-                await asyncio.gather(send_task, recv_task, return_exceptions=True)
+                # The loops only return on a closed connection or an error; if
+                # any of them ends, tear the session down instead of leaving
+                # the others running (e.g. recv feeding a dead forwarder).
+                try:
+                    done, _ = await asyncio.wait(
+                        (stop_task, *tasks), return_when=asyncio.FIRST_COMPLETED
+                    )
+                finally:
+                    for task in (stop_task, *tasks):
+                        task.cancel()
+                    await asyncio.gather(stop_task, *tasks, return_exceptions=True)
+
+                for task in tasks:
+                    if task in done and not task.cancelled():
+                        exc = task.exception()
+                        if exc is not None:
+                            _LOGGER.error(
+                                "Gemini Live %s failed; ending session", task.get_name(), exc_info=exc
+                            )
         except asyncio.CancelledError:
             raise
         except Exception:
             _LOGGER.exception("Gemini Live session crashed")
         finally:
+            # Let a pending barge-in AudioStop finish before the session goes.
+            drop_task, self._drop_task = self._drop_task, None
+            if drop_task is not None:
+                await asyncio.gather(drop_task, return_exceptions=True)
+
             # Ensure we close any open output audio stream
             if self._output_stream_open:
                 try:
@@ -171,44 +248,110 @@ class GeminiLiveController:
                     pass
                 self._output_stream_open = False
 
+    async def _get_live_config(self) -> types.LiveConnectConfig:
+        """Session config, reused for _CONFIG_TTL_S so reconnects skip the HA fetch."""
+        now = time.monotonic()
+        if self._cfg_cache is not None and now - self._cfg_cache[0] < _CONFIG_TTL_S:
+            return self._cfg_cache[1]
+
+        # Build system prompt with HA context injection.
+        entities_ok, entity_lines = await self._ha.build_entity_context_lines(
+            allowed_domains=self._settings.allowed_domains,
+            allowlist=self._settings.entity_allowlist,
+            blocklist=self._settings.entity_blocklist,
+            max_entities=self._settings.max_context_entities,
+        )
+        system_prompt = build_system_prompt(entity_lines)
+
+        tools = build_tools()
+
+        live_config = types.LiveConnectConfig(
+            response_modalities=["AUDIO"],
+            tools=tools,
+            speech_config=types.SpeechConfig(
+                voice_config=types.VoiceConfig(
+                    prebuilt_voice_config=types.PrebuiltVoiceConfig(voice_name="Zephyr")
+                )
+            ),
+            system_instruction=types.Content(
+                role="user",
+                parts=[types.Part.from_text(text=system_prompt)],
+            ),
+        )
+        if entities_ok:
+            # A failed HA fetch is not cached, so the next reconnect retries it.
+            self._cfg_cache = (time.monotonic(), live_config)
+        return live_config
+
     async def _send_loop(self, session: Any) -> None:
         """Drain input audio queue and send to Gemini."""
         rate = self._settings.input_sample_rate_hz
+        # Coalesce a backlog of up to _SEND_BATCH_MAX_CHUNKS chunks (never more
+        # than ~1 s of audio) into one frame; a lone chunk is sent as-is so
+        # latency stays low when the ring is drained.
+        max_batch_bytes = rate * 2
+        pending = self._in_deque
         while True:
-            pcm16 = await self._input_audio_queue.get()
+            if not pending:
+                await self._in_event.wait()
+                self._in_event.clear()
+                continue
+            pcm16 = pending.popleft()
+            if pending and len(pcm16) + len(pending[0]) <= max_batch_bytes:
+                batch = [pcm16]
+                size = len(pcm16)
+                while (
+                    pending
+                    and len(batch) < _SEND_BATCH_MAX_CHUNKS
+                    and size + len(pending[0]) <= max_batch_bytes
+                ):
+                    chunk = pending.popleft()
+                    batch.append(chunk)
+                    size += len(chunk)
+                pcm16 = b"".join(batch)
 
             # AI Studio sample uses session.send(input=msg), NOT send_realtime_input!
             # This is what worked in our direct test (the screeching audio)
-            msg = {"data": pcm16, "mime_type": "audio/pcm"}
-            await session.send(input=msg)
+            # Pre-encoded as a media_chunks list, the SDK forwards the chunk
+            # verbatim instead of round-tripping it through a pydantic Blob.
+            # (URL-safe alphabet: byte-identical to what the Blob path sends.)
+            msg = {"data": urlsafe_b64encode(pcm16).decode("ascii"), "mime_type": "audio/pcm"}
+            await session.send(input=[msg])
 
     async def _recv_loop(self, session: Any) -> None:
-        """Receive turns from Gemini and forward audio + tool calls."""
+        """Receive turns from Gemini; hand audio to _forward_loop, run tool calls."""
+        out_deque = self._out_deque
+        out_event = self._out_event
         while True:
             turn = session.receive()
             # Reset barge-in flag at the start of a model turn.
             # If the user starts speaking, the wyoming handler sets it again.
             self._barge_in = False
+            # Sampled per turn so the message loop skips debug-only work.
+            debug = _LOGGER.isEnabledFor(logging.DEBUG)
 
             saw_audio = False
 
             try:
                 async for msg in turn:
                     # Fast-path: audio bytes show up as msg.data in many samples.
-                    audio_bytes: bytes | None = None
-                    if getattr(msg, "data", None):
-                        if isinstance(msg.data, (bytes, bytearray)):
-                            audio_bytes = bytes(msg.data)
+                    # (Copied into the forwarder's accumulator, so no bytes() copy here.)
+                    audio_bytes: bytes | bytearray | None = None
+                    data = getattr(msg, "data", None)
+                    if data and isinstance(data, (bytes, bytearray)):
+                        audio_bytes = data
 
                     # Slow-path: structured server content (model_turn parts)
                     if audio_bytes is None:
-                        server_content = getattr(msg, "server_content", None)
-                        model_turn = getattr(server_content, "model_turn", None) if server_content else None
-                        if model_turn and getattr(model_turn, "parts", None):
-                            for part in model_turn.parts:
+                        try:
+                            parts = msg.server_content.model_turn.parts
+                        except AttributeError:
+                            parts = None
+                        if parts:
+                            for part in parts:
                                 inline = getattr(part, "inline_data", None)
-                                if inline and isinstance(getattr(inline, "data", None), (bytes, bytearray)):
-                                    audio_bytes = bytes(inline.data)
+                                if inline is not None and isinstance(inline.data, (bytes, bytearray)):
+                                    audio_bytes = inline.data
                                     break
 
                     if audio_bytes:
@@ -217,32 +360,15 @@ class GeminiLiveController:
                             # User started talking; stop forwarding model speech.
                             continue
 
-                        # Gemini audio is 24kHz PCM16 mono; resample to configured output rate.
-                        pcm_out = resample_pcm16(
-                            audio_bytes,
-                            src_rate_hz=self._settings.gemini_output_sample_rate_hz,
-                            dst_rate_hz=self._settings.output_sample_rate_hz,
-                        )
-
-                        # Open an output stream on first audio chunk
-                        if not self._output_stream_open:
-                            await self._out.on_start(self._settings.output_sample_rate_hz)
-                            self._output_stream_open = True
-
-                        # Split large chunks into smaller Wyoming chunks (e.g. 2048 bytes)
-                        # Some clients or network layers might struggle with 30KB+ events.
-                        chunk_size = 2048
-                        chunk_count = 0
-                        for i in range(0, len(pcm_out), chunk_size):
-                            chunk = pcm_out[i : i + chunk_size]
-                            if chunk:
-                                await self._out.on_chunk(chunk, self._settings.output_sample_rate_hz)
-                                chunk_count += 1
-                        _LOGGER.debug(f"DEBUG: Sent {chunk_count} chunks (size ~{chunk_size}) to client.")
-
-                    # Text can show up too (debug)
-                    if getattr(msg, "text", None):
-                        _LOGGER.debug("Gemini text: %s", msg.text)
+                        out_deque.append(audio_bytes)
+                        out_event.set()
+
+                    # Text can show up too (debug). msg.text walks the parts,
+                    # so only look at it when debug logging is on.
+                    if debug:
+                        text = getattr(msg, "text", None)
+                        if text:
+                            _LOGGER.debug("Gemini text: %s", text)
 
                     # Tool calls
                     tool_call = getattr(msg, "tool_call", None)
@@ -256,14 +382,95 @@ class GeminiLiveController:
                     break
                 raise
 
-            # Turn complete.
-            if self._output_stream_open:
-                await self._out.on_stop()
-                self._output_stream_open = False
+            # Turn complete; the forwarder flushes and closes the output stream.
+            out_deque.append(None)
+            out_event.set()
 
             # If Gemini produced no audio but did tool calls/text, we do nothing.
             # The model typically speaks after tool responses; if not, that's fine.
 
+    async def _forward_loop(self) -> None:
+        """Resample queued model audio and forward it to the client.
+
+        Runs beside _recv_loop so Wyoming socket writes don't hold up reading
+        the next Gemini message. A None entry marks the end of a model turn.
+        """
+        pending = self._out_deque
+        out_accum = self._out_accum
+        out_accum_target = self._out_accum_target_bytes
+        # Settings and callbacks are fixed for the session; bind them once.
+        out_rate = self._settings.output_sample_rate_hz
+        on_start = self._out.on_start
+        on_chunk = self._out.on_chunk
+        on_stop = self._out.on_stop
+        while True:
+            if not pending:
+                await self._out_event.wait()
+                self._out_event.clear()
+                continue
+            audio_bytes = pending.popleft()
+
+            if audio_bytes is None:
+                # Turn complete; forward whatever is still buffered.
+                if out_accum and not self._barge_in:
+                    await self._flush_output_audio(out_rate, on_start, on_chunk)
+                out_accum.clear()
+                if self._output_stream_open:
+                    await on_stop()
+                    self._output_stream_open = False
+                self._out_resampler.reset()
+                continue
+
+            if self._barge_in:
+                out_accum.clear()
+                continue
+
+            out_accum += audio_bytes
+            if len(out_accum) >= out_accum_target:
+                await self._flush_output_audio(out_rate, on_start, on_chunk)
+
+    async def _flush_output_audio(
+        self,
+        out_rate: int,
+        on_start: Callable[[int], Awaitable[None]],
+        on_chunk: Callable[[bytes, int], Awaitable[None]],
+    ) -> None:
+        """Resample and forward the buffered model audio in one batch."""
+        # Gemini audio is 24kHz PCM16 mono; resample to configured output rate.
+        # The resampler reads the accumulator directly (no bytes() snapshot);
+        # it is only cleared once process() has returned.
+        gen = self._barge_gen
+        pcm_out = await asyncio.get_running_loop().run_in_executor(
+            self._resample_exec, self._out_resampler.process, self._out_accum
+        )
+        self._out_accum.clear()
+        if gen != self._barge_gen:
+            # User barged in while this batch was resampling; drop it.
+            return
+
+        # Open an output stream on first audio chunk; the forwarding below is
+        # the same either way.
+        if not self._output_stream_open:
+            drop_task = self._drop_task
+            if drop_task is not None and not drop_task.done():
+                # Let the barge-in AudioStop go out before the next AudioStart.
+                await asyncio.gather(drop_task, return_exceptions=True)
+            await on_start(out_rate)
+            self._output_stream_open = True
+
+        # Split large chunks into smaller Wyoming chunks (e.g. 2048 bytes)
+        # Some clients or network layers might struggle with 30KB+ events.
+        chunk_size = 2048
+        chunk_count = 0
+        for i in range(0, len(pcm_out), chunk_size):
+            if gen != self._barge_gen:
+                # Barge-in mid-batch: the stream was closed, send nothing more.
+                break
+            await on_chunk(pcm_out[i : i + chunk_size], out_rate)
+            chunk_count += 1
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug("Sent %d chunks (size ~%d) to client.", chunk_count, chunk_size)
+
     async def _handle_tool_calls(self, session: Any, function_calls: Any) -> None:
         responses: list[types.FunctionResponse] = []
 
@@ -278,7 +485,7 @@ class GeminiLiveController:
                     types.FunctionResponse(
                         id=fc_id,
                         name=str(fc_name or "unknown"),
-                        response={"ok": False, "error": "Unknown tool"},
+                        response=_UNKNOWN_TOOL_RESPONSE,
                     )
                 )
                 continue
@@ -312,11 +519,11 @@ class GeminiLiveController:
         if entity_id:
             data["entity_id"] = entity_id
 
-        if isinstance(service_data_json, str) and service_data_json.strip():
+        if isinstance(service_data_json, str) and service_data_json and not service_data_json.isspace():
             try:
-                extra = json.loads(service_data_json)
+                extra = _json_loads(service_data_json)
                 if isinstance(extra, Mapping):
-                    data.update(dict(extra))
+                    data.update(extra)
             except Exception:
                 # Don't fail the call; just ignore malformed JSON.
                 pass
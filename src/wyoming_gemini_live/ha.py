@@ -2,11 +2,14 @@ from __future__ import annotations
 
 import fnmatch
 import logging
+import re
 from dataclasses import dataclass
-from typing import Any, Iterable, Mapping, Sequence
+from typing import Any, Collection, Iterable, Mapping, Pattern, Sequence, Union
 
 import aiohttp
 
+from ._json import loads as _json_loads
+
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -19,39 +22,56 @@ class EntityView:
     domain: str
 
 
-def _domain(entity_id: str) -> str:
-    return entity_id.split(".", 1)[0] if "." in entity_id else ""
+# Allow/block entries are either fnmatch globs or regexes precompiled from them.
+EntityPattern = Union[str, Pattern[str]]
+# A whole list may also be passed as one precompiled alternation (Settings
+# stores that form), which is then used as-is.
+EntityPatterns = Union[Pattern[str], Sequence[EntityPattern], None]
 
 
-def _matches_any(patterns: Sequence[str], value: str) -> bool:
-    for pat in patterns:
-        if fnmatch.fnmatch(value, pat):
-            return True
-    return False
+def _compile_patterns(patterns: EntityPatterns) -> Pattern[str] | None:
+    """Fold a list of globs/regexes into one alternation (None if empty)."""
+    if isinstance(patterns, re.Pattern):
+        return patterns
+    if not patterns:
+        return None
+    return re.compile(
+        "|".join(fnmatch.translate(p) if isinstance(p, str) else p.pattern for p in patterns)
+    )
 
 
 def filter_entities(
     states: Sequence[Mapping[str, Any]],
-    allowed_domains: Sequence[str],
-    allowlist: Sequence[str],
-    blocklist: Sequence[str],
+    allowed_domains: Collection[str],
+    allowlist: EntityPatterns,
+    blocklist: EntityPatterns,
     max_entities: int,
 ) -> list[EntityView]:
+    allowed_domains = frozenset(allowed_domains)
+    allow_re = _compile_patterns(allowlist)
+    block_re = _compile_patterns(blocklist)
+
     out: list[EntityView] = []
     for s in states:
-        entity_id = str(s.get("entity_id", "")).strip()
-        if not entity_id:
+        # Cheapest checks first; most entities are rejected by domain, before
+        # any attribute/string work. HA entity_ids are always "domain.object_id".
+        entity_id = s.get("entity_id")
+        if not isinstance(entity_id, str):
+            continue
+        idx = entity_id.find(".")
+        if idx < 0:
             continue
 
-        dom = _domain(entity_id)
+        dom = entity_id[:idx]
         if allowed_domains and dom not in allowed_domains:
             continue
 
-        if allowlist and not _matches_any(allowlist, entity_id):
+        if allow_re is not None and not allow_re.match(entity_id):
             continue
-        if blocklist and _matches_any(blocklist, entity_id):
+        if block_re is not None and block_re.match(entity_id):
             continue
 
+        # Only entities being kept get their name/state built.
         attrs = s.get("attributes") or {}
         name = str(attrs.get("friendly_name") or entity_id)
         state = str(s.get("state", "unknown"))
@@ -67,31 +87,47 @@ class HomeAssistantClient:
     def __init__(self, base_url: str, token: str) -> None:
         self._base_url = base_url.rstrip("/")
         self._token = token.strip()
+        # The token never changes, so the headers are built once.
+        self._headers = {
+            "Authorization": f"Bearer {self._token}",
+            "Content-Type": "application/json",
+        }
+        self._session: aiohttp.ClientSession | None = None
 
     @property
     def is_configured(self) -> bool:
         return bool(self._base_url) and bool(self._token)
 
-    def _headers(self) -> dict[str, str]:
-        return {
-            "Authorization": f"Bearer {self._token}",
-            "Content-Type": "application/json",
-        }
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Shared keep-alive session, created lazily on the running loop."""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=10, keepalive_timeout=60),
+                headers=self._headers,
+            )
+        return self._session
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP session (if one was opened)."""
+        session, self._session = self._session, None
+        if session is not None and not session.closed:
+            await session.close()
 
     async def get_states(self) -> list[dict[str, Any]]:
         url = f"{self._base_url}/api/states"
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=self._headers()) as resp:
-                if resp.status != 200:
-                    text = await resp.text()
-                    if resp.status == 401:
-                        _LOGGER.warning("Home Assistant is not authorized (401). Check SUPERVISOR_TOKEN or 'ha_token' option.")
-                        return []
-                    raise RuntimeError(f"HA /api/states failed: {resp.status} {text}")
-                data = await resp.json()
-                if not isinstance(data, list):
-                    raise RuntimeError("HA /api/states returned non-list JSON")
-                return [dict(x) for x in data]
+        async with self._get_session().get(url) as resp:
+            if resp.status != 200:
+                text = await resp.text()
+                if resp.status == 401:
+                    _LOGGER.warning("Home Assistant is not authorized (401). Check SUPERVISOR_TOKEN or 'ha_token' option.")
+                    return []
+                raise RuntimeError(f"HA /api/states failed: {resp.status} {text}")
+            # Parse the raw body directly (skips aiohttp's charset sniffing).
+            data = _json_loads(await resp.read())
+            if not isinstance(data, list):
+                raise RuntimeError("HA /api/states returned non-list JSON")
+            # Freshly parsed and only read by callers; no defensive copy needed.
+            return data
 
     async def call_service(
         self,
@@ -114,26 +150,29 @@ class HomeAssistantClient:
         url = f"{self._base_url}/api/services/{domain}/{service}"
         payload: dict[str, Any] = dict(data or {})
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, headers=self._headers(), json=payload) as resp:
-                body = await resp.text()
-                if resp.status == 200:
-                    return (True, "ok")
-                return (False, f"HTTP {resp.status}: {body[:500]}")
+        async with self._get_session().post(url, json=payload) as resp:
+            body = await resp.text()
+            if resp.status == 200:
+                return (True, "ok")
+            return (False, f"HTTP {resp.status}: {body[:500]}")
 
     async def build_entity_context_lines(
         self,
-        allowed_domains: Sequence[str],
-        allowlist: Sequence[str],
-        blocklist: Sequence[str],
+        allowed_domains: Collection[str],
+        allowlist: EntityPatterns,
+        blocklist: EntityPatterns,
         max_entities: int,
-    ) -> list[str]:
-        """Create concise lines for prompt injection."""
+    ) -> tuple[bool, list[str]]:
+        """Create concise lines for prompt injection.
+
+        Returns (ok, lines); ok is False when the entity list could not be
+        fetched and lines only hold a placeholder.
+        """
         try:
             states = await self.get_states()
         except Exception as e:
             _LOGGER.warning("Failed to fetch HA states for context injection: %s", e)
-            return ["(Could not fetch Home Assistant entity list.)"]
+            return (False, ["(Could not fetch Home Assistant entity list.)"])
 
         entities = filter_entities(
             states=states,
@@ -151,4 +190,4 @@ class HomeAssistantClient:
         if not lines:
             lines.append("(No entities matched the current filters.)")
 
-        return lines
+        return (True, lines)
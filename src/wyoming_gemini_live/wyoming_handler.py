@@ -43,6 +43,7 @@ class GeminiLiveEventHandler(AsyncEventHandler):
                 on_start=self._send_audio_start,
                 on_chunk=self._send_audio_chunk,
                 on_stop=self._send_audio_stop,
+                on_drop=self._send_audio_stop,
             ),
         )
 
@@ -51,6 +52,7 @@ class GeminiLiveEventHandler(AsyncEventHandler):
             await super().run()
         finally:
             await self._gemini.stop()
+            await self._ha.aclose()
 
     async def handle_event(self, event: Event) -> bool:
         # Some clients will start with Describe; we just ack (no Info yet).
@@ -93,9 +95,8 @@ class GeminiLiveEventHandler(AsyncEventHandler):
         await self.write_event(AudioStart(rate=rate_hz, width=2, channels=1).event())
 
     async def _send_audio_chunk(self, pcm16: bytes, rate_hz: int) -> None:
-        _LOGGER.debug("Sending AudioChunk (%d bytes) to client", len(pcm16))
+        # Hot path (tens of chunks/sec): no per-chunk logging.
         await self.write_event(AudioChunk(rate=rate_hz, audio=pcm16, timestamp=0).event())
-        _LOGGER.debug("AudioChunk sent.")
 
     async def _send_audio_stop(self) -> None:
         await self.write_event(AudioStop().event())
@@ -1,7 +1,7 @@
 
 import pytest
 import numpy as np
-from wyoming_gemini_live.audio import resample_pcm16, iter_silence_chunks, PCM16_DTYPE
+from wyoming_gemini_live.audio import PolyphaseResampler, resample_pcm16, iter_silence_chunks, PCM16_DTYPE
 
 def test_resample_simple():
     # 16kHz -> 16kHz (no change)
@@ -30,3 +30,30 @@ def test_iter_silence():
     assert len(chunks) == 10
     assert len(chunks[0]) == 160 * 2
     assert all(c == b'\x00' * 320 for c in chunks)
+
+def test_resample_matches_resample_poly():
+    # Cached FIR path should match scipy's reference implementation
+    from scipy import signal
+    rng = np.random.default_rng(0)
+    x = (rng.standard_normal(1000) * 8000).astype(PCM16_DTYPE)
+    ref = signal.resample_poly(x.astype(np.float32), up=3, down=2)
+    ref = np.clip(ref, -32768, 32767).astype(PCM16_DTYPE)
+    out = np.frombuffer(resample_pcm16(x.tobytes(), 16000, 24000), dtype=PCM16_DTYPE)
+    assert out.shape == ref.shape
+    assert np.abs(out.astype(np.int32) - ref).max() <= 1
+
+def test_polyphase_resampler_chunking_invariant():
+    # Streaming output must not depend on how the input was chunked
+    rng = np.random.default_rng(1)
+    x = (rng.standard_normal(2400) * 8000).astype(PCM16_DTYPE)
+
+    whole = PolyphaseResampler(24000, 16000).process(x.tobytes())
+
+    rs = PolyphaseResampler(24000, 16000)
+    parts = [rs.process(x[i : i + 317].tobytes()) for i in range(0, x.size, 317)]
+    assert b"".join(parts) == whole
+    assert len(whole) // 2 <= 1600
+
+def test_polyphase_resampler_passthrough():
+    data = np.arange(10, dtype=PCM16_DTYPE).tobytes()
+    assert PolyphaseResampler(16000, 16000).process(data) == data
@@ -0,0 +1,375 @@
+import asyncio
+import base64
+
+from wyoming_gemini_live.config import Settings
+from wyoming_gemini_live.gemini import GeminiLiveController, OutputAudioCallbacks
+
+
+class _FakeHA:
+    async def call_service(self, domain, service, data):
+        return (True, "ok")
+
+
+def _controller(**settings):
+    async def noop(*args):
+        pass
+
+    return GeminiLiveController(
+        Settings(gemini_api_key="test", **settings),
+        _FakeHA(),
+        OutputAudioCallbacks(on_start=noop, on_chunk=noop, on_stop=noop),
+    )
+
+
+class _SendSession:
+    def __init__(self):
+        self.frames = []
+
+    async def send(self, input):
+        (msg,) = input
+        self.frames.append(base64.urlsafe_b64decode(msg["data"]))
+
+
+def _drain_send_loop(chunk, count):
+    async def run():
+        ctl = _controller()
+        session = _SendSession()
+        for _ in range(count):
+            ctl._in_deque.append(chunk)
+        ctl._in_event.set()
+
+        task = asyncio.create_task(ctl._send_loop(session))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        await ctl.stop()
+        return session.frames
+
+    return asyncio.run(run())
+
+
+def test_send_loop_coalesces_backlog():
+    # Default 1024-sample chunks: four per frame.
+    chunk = bytes(2 * Settings().audio_chunk_size)
+    frames = _drain_send_loop(chunk, 20)
+    assert len(frames) == 5
+    assert b"".join(frames) == chunk * 20
+
+    # 8 KiB client chunks: capped at ~1 s of 16 kHz audio per frame.
+    chunk = b"\x01\x00" * 4096
+    frames = _drain_send_loop(chunk, 20)
+    assert [len(f) // len(chunk) for f in frames] == [3] * 6 + [2]
+    assert b"".join(frames) == chunk * 20
+
+
+class _ClosedOK(Exception):
+    pass
+
+
+_ClosedOK.__name__ = "ConnectionClosedOK"
+
+
+class _Turn:
+    def __init__(self, chunks, delay=0.0, last=False):
+        self._chunks = chunks
+        self._delay = delay
+        self._last = last
+
+    def __aiter__(self):
+        return self._gen()
+
+    async def _gen(self):
+        for chunk in self._chunks:
+            await asyncio.sleep(self._delay)
+            yield _Msg(chunk)
+        if self._last:
+            await asyncio.sleep(self._delay)
+            raise _ClosedOK()
+
+
+class _Msg:
+    server_content = None
+    text = None
+    tool_call = None
+
+    def __init__(self, data):
+        self.data = data
+
+
+class _RecvSession:
+    def __init__(self, turns):
+        self._turns = iter(turns)
+
+    def receive(self):
+        return next(self._turns)
+
+
+class _Recorder:
+    """Output callbacks that log start/chunk/stop in order."""
+
+    def __init__(self, chunk_delay=0.0):
+        self.log = []
+        self.on_first_chunk = None
+        self._chunk_delay = chunk_delay
+
+    async def on_start(self, rate):
+        self.log.append("start")
+
+    async def on_chunk(self, pcm, rate):
+        self.log.append(len(pcm))
+        if self.on_first_chunk is not None:
+            cb, self.on_first_chunk = self.on_first_chunk, None
+            cb()
+        await asyncio.sleep(self._chunk_delay)
+
+    async def on_stop(self):
+        self.log.append("stop")
+
+    def callbacks(self):
+        return OutputAudioCallbacks(
+            on_start=self.on_start, on_chunk=self.on_chunk, on_stop=self.on_stop, on_drop=self.on_stop
+        )
+
+
+def _run_output(ctl, turns, before=None):
+    """Drive _recv_loop + _forward_loop against a fake session until drained."""
+
+    async def run():
+        forward = asyncio.create_task(ctl._forward_loop())
+        if before is not None:
+            before(asyncio.get_running_loop())
+        await ctl._recv_loop(_RecvSession(turns))
+        for _ in range(200):
+            if not (ctl._out_deque or ctl._out_accum):
+                break
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.1)
+        forward.cancel()
+        await asyncio.gather(forward, return_exceptions=True)
+        await ctl.stop()
+
+    asyncio.run(run())
+
+
+def _output_controller(rec):
+    return GeminiLiveController(Settings(gemini_api_key="test"), _FakeHA(), rec.callbacks())
+
+
+def _assert_well_formed(log):
+    open_ = False
+    for item in log:
+        if item == "start":
+            assert not open_
+            open_ = True
+        elif item == "stop":
+            assert open_
+            open_ = False
+        else:
+            assert open_, f"chunk outside start/stop: {log}"
+    assert not open_
+
+
+def _model_audio(ms):
+    return b"\x01\x00" * (24 * ms)  # 24 kHz PCM16 mono
+
+
+def test_barge_in_stops_chunks_even_if_flag_cleared():
+    rec = _Recorder(chunk_delay=0.01)
+    ctl = _output_controller(rec)
+
+    def barge_in():
+        ctl.notify_barge_in()
+        ctl._barge_in = False  # what enqueue_audio does on the next mic chunk
+
+    rec.on_first_chunk = barge_in
+    _run_output(ctl, [_Turn([_model_audio(400)], last=True)])
+    _assert_well_formed(rec.log)
+    assert rec.log == ["start", 2048, "stop"]
+
+
+def test_barge_in_drops_batch_being_resampled():
+    rec = _Recorder()
+    ctl = _output_controller(rec)
+    process = ctl._out_resampler.process
+
+    def slow_process(pcm):
+        import time
+
+        time.sleep(0.1)
+        return process(pcm)
+
+    ctl._out_resampler.process = slow_process
+
+    def barge_in():
+        ctl.notify_barge_in()
+        ctl._barge_in = False
+
+    _run_output(
+        ctl,
+        [_Turn([_model_audio(100)], last=True)],
+        before=lambda loop: loop.call_later(0.05, barge_in),
+    )
+    assert rec.log == []
+
+
+def test_output_path_ordering_and_length():
+    from wyoming_gemini_live.audio import PolyphaseResampler
+
+    rec = _Recorder()
+    ctl = _output_controller(rec)
+    turn1 = [_model_audio(20)] * 7  # 140 ms in 20 ms messages
+    turn2 = [_model_audio(30)]  # below the 40 ms batch: only the turn-end flush sends it
+    _run_output(ctl, [_Turn(turn1, delay=0.005), _Turn(turn2, delay=0.005), _Turn([], last=True)])
+
+    _assert_well_formed(rec.log)
+    assert rec.log.count("start") == 2
+    stop1 = rec.log.index("stop")
+    per_turn = [rec.log[:stop1], rec.log[stop1 + 1 :]]
+    for chunks, msgs in zip(per_turn, (turn1, turn2)):
+        expected = len(PolyphaseResampler(24000, 16000).process(b"".join(msgs)))
+        assert expected > 0
+        assert sum(c for c in chunks if isinstance(c, int)) == expected
+
+
+class _Connect:
+    def __init__(self, session):
+        self._session = session
+
+    async def __aenter__(self):
+        return self._session
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class _Client:
+    """Stands in for genai.Client; each connect() hands out the next session."""
+
+    def __init__(self, sessions):
+        sessions = iter(sessions)
+        live = type("live", (), {"connect": lambda self, model, config: _Connect(next(sessions))})()
+        self.aio = type("aio", (), {"live": live})()
+
+
+async def _no_live_config():
+    return None
+
+
+def test_forwarder_failure_ends_session():
+    async def broken_chunk(pcm, rate):
+        raise ConnectionResetError("client went away")
+
+    async def noop(*args):
+        pass
+
+    async def run():
+        ctl = GeminiLiveController(
+            Settings(gemini_api_key="test"),
+            _FakeHA(),
+            OutputAudioCallbacks(on_start=noop, on_chunk=broken_chunk, on_stop=noop),
+        )
+
+        ctl._get_live_config = _no_live_config
+        # recv never finishes on its own; only the forwarder failure can end _run.
+        never = asyncio.Event()
+
+        class _Endless(_Turn):
+            async def _gen(self):
+                yield _Msg(_model_audio(100))
+                await never.wait()
+
+        ctl._client = _Client([_RecvSession([_Endless([])])])
+        await asyncio.wait_for(ctl._run(), timeout=2)
+        await ctl.stop()
+
+    asyncio.run(run())
+
+
+def test_live_config_cache_skips_failed_ha_fetch():
+    class _ContextHA(_FakeHA):
+        def __init__(self, ok):
+            self.ok = ok
+            self.calls = 0
+
+        async def build_entity_context_lines(self, **kwargs):
+            self.calls += 1
+            return (self.ok, ["- Light (light.a) = on"] if self.ok else ["(Could not fetch Home Assistant entity list.)"])
+
+    async def run(ha):
+        async def noop(*args):
+            pass
+
+        ctl = GeminiLiveController(
+            Settings(gemini_api_key="test"), ha, OutputAudioCallbacks(on_start=noop, on_chunk=noop, on_stop=noop)
+        )
+        await ctl._get_live_config()
+        await ctl._get_live_config()
+        await ctl.stop()
+
+    failing = _ContextHA(ok=False)
+    asyncio.run(run(failing))
+    assert failing.calls == 2
+
+    working = _ContextHA(ok=True)
+    asyncio.run(run(working))
+    assert working.calls == 1
+
+
+def test_barge_in_drop_failure_is_logged(caplog):
+    rec = _Recorder(chunk_delay=0.01)
+
+    async def failing_drop():
+        raise ConnectionResetError("client went away")
+
+    ctl = GeminiLiveController(
+        Settings(gemini_api_key="test"),
+        _FakeHA(),
+        OutputAudioCallbacks(
+            on_start=rec.on_start, on_chunk=rec.on_chunk, on_stop=rec.on_stop, on_drop=failing_drop
+        ),
+    )
+    rec.on_first_chunk = ctl.notify_barge_in
+    with caplog.at_level("WARNING", logger="wyoming_gemini_live.gemini"):
+        _run_output(ctl, [_Turn([_model_audio(400)], last=True)])
+    assert rec.log == ["start", 2048]
+    assert ctl._drop_task.done()
+    assert "Failed to send barge-in AudioStop" in caplog.text
+
+
+def test_leftover_audio_does_not_leak_into_next_session():
+    from wyoming_gemini_live.audio import PolyphaseResampler
+
+    rec = _Recorder()
+    ctl = _output_controller(rec)
+    ctl._get_live_config = _no_live_config
+    never = asyncio.Event()
+
+    class _Blocking(_Turn):
+        async def _gen(self):
+            await never.wait()
+            yield
+
+    # Session 1 closes mid-turn with 20 ms (below one batch) still buffered.
+    session1 = _RecvSession([_Turn([_model_audio(100), _model_audio(20)], delay=0.01, last=True)])
+    reply = _model_audio(60)
+    session2 = _RecvSession([_Turn([reply], delay=0.01), _Blocking([])])
+    ctl._client = _Client([session1, session2])
+
+    async def run():
+        await asyncio.wait_for(ctl._run(), timeout=2)
+        second = asyncio.create_task(ctl._run())
+        for _ in range(200):
+            if rec.log.count("stop") == 2:
+                break
+            await asyncio.sleep(0.01)
+        ctl._stop_evt.set()
+        await asyncio.wait_for(second, timeout=2)
+        await ctl.stop()
+
+    asyncio.run(run())
+    _assert_well_formed(rec.log)
+    second_reply = rec.log[rec.log.index("stop") + 1 :]
+    assert second_reply[0] == "start" and second_reply[-1] == "stop"
+    assert sum(c for c in second_reply if isinstance(c, int)) == len(
+        PolyphaseResampler(24000, 16000).process(reply)
+    )
@@ -38,3 +38,56 @@ def test_max_entities():
     states = [{"entity_id": f"light.{i}", "state": "on"} for i in range(20)]
     res = filter_entities(states, allowed_domains=["light"], allowlist=[], blocklist=[], max_entities=5)
     assert len(res) == 5
+
+def test_precompiled_patterns():
+    import fnmatch
+    import re
+
+    states = [
+        {"entity_id": "light.kitchen_main", "state": "on"},
+        {"entity_id": "light.kitchen_spare", "state": "on"},
+        {"entity_id": "light.bedroom", "state": "off"},
+    ]
+    allow = (re.compile(fnmatch.translate("light.kitchen_*")),)
+    block = (re.compile(fnmatch.translate("*_spare")),)
+    res = filter_entities(states, allowed_domains=frozenset({"light"}), allowlist=allow, blocklist=block, max_entities=10)
+    assert [e.entity_id for e in res] == ["light.kitchen_main"]
+
+def test_multiple_globs():
+    states = [
+        {"entity_id": "light.kitchen", "state": "on"},
+        {"entity_id": "switch.fan", "state": "off"},
+        {"entity_id": "switch.heater", "state": "off"},
+    ]
+    res = filter_entities(
+        states,
+        allowed_domains=["light", "switch"],
+        allowlist=["light.*", "switch.*"],
+        blocklist=["*.heater", "*.garage"],
+        max_entities=10,
+    )
+    assert [e.entity_id for e in res] == ["light.kitchen", "switch.fan"]
+
+def test_skips_malformed_entity_ids():
+    states = [
+        {"entity_id": "light.ok", "state": "on"},
+        {"entity_id": "nodot", "state": "on"},
+        {"entity_id": None, "state": "on"},
+        {"state": "on"},
+    ]
+    res = filter_entities(states, allowed_domains=[], allowlist=[], blocklist=[], max_entities=10)
+    assert [e.entity_id for e in res] == ["light.ok"]
+
+def test_settings_patterns_used_as_is():
+    from wyoming_gemini_live.config import _compile_globs
+
+    states = [
+        {"entity_id": "light.kitchen", "state": "on"},
+        {"entity_id": "light.garage", "state": "on"},
+        {"entity_id": "switch.fan", "state": "off"},
+    ]
+    allow = _compile_globs(["light.*", "switch.*"])
+    block = _compile_globs(["*.garage"])
+    res = filter_entities(states, allowed_domains=frozenset(), allowlist=allow, blocklist=block, max_entities=10)
+    assert [e.entity_id for e in res] == ["light.kitchen", "switch.fan"]
+    assert _compile_globs([]) is None